@@ -1,37 +1,34 @@
-import os
-import sys
-
-# Add src to path so we can import modules
-sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
-
-from src.config import ConfigManager
+from src.config import ConfigManager, DEFAULT_TRANSLATION_MODEL
 from src.ui import CaptionWindow, ConfigWindow
 from src.audio_handler import AudioRecorder
+from src.translator import preload_translator
 
-if __name__ == "__main__":
+def run_from_config():
+    """Starts captions directly from the saved config, or opens the settings."""
     # Check if config exists to auto-start
     config = ConfigManager.load_config()
-    
+
     # If we have a valid config, try to start directly
     if config.get("device_name") and config.get("model_size"):
         # We need to find the device index first
         try:
             devices = AudioRecorder.get_audio_devices()
-            device_index = None
-            for i, device in enumerate(devices):
-                if device['name'] == config["device_name"]:
-                    device_index = i
-                    break
-            
+            device_index = AudioRecorder.get_device_indices(devices).get(config["device_name"])
+
             if device_index is not None:
                 # Direct Start
                 print(f"🚀 Auto-starting with saved config: {config}")
+                translation_lang = config.get("translation_lang", "es")
+                translation_model = config.get("translation_model", DEFAULT_TRANSLATION_MODEL)
+                # Load the translation LLM while the caption window is built
+                preload_translator(translation_model, translation_lang)
                 CaptionWindow(
                     config["model_size"],
                     device_index,
-                    config["device_name"], 
-                    config.get("language", "en"), 
-                    config.get("translation_lang", "es")
+                    config["device_name"],
+                    config.get("language", "en"),
+                    translation_lang,
+                    translation_model
                 )
             else:
                 # Device not found, show config
@@ -42,3 +39,6 @@ if __name__ == "__main__":
             ConfigWindow()
     else:
         ConfigWindow()
+
+if __name__ == "__main__":
+    run_from_config()
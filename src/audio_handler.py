@@ -1,15 +1,80 @@
 import sounddevice as sd
-import queue
+import math
 import threading
 from typing import List, Dict, Any, Optional
 import numpy as np
+from .config import AUDIO_BLOCK_SIZE
+
+class AudioRingBuffer:
+    """Single-producer/single-consumer ring of mono int16 PCM samples.
+
+    The audio callback writes straight into preallocated storage and only
+    publishes a new write position, so the real-time thread never allocates
+    or takes a queue lock. Samples stay int16 (half the bytes of float32)
+    until they are read, when they are converted to float32 in [-1, 1).
+    If the consumer falls more than `capacity` samples behind, the oldest
+    audio is skipped.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        # Monotonic sample counters; each one is only written by one thread
+        self._write_total = 0
+        self._read_total = 0
+        self._data_ready = threading.Event()
+
+    def available(self) -> int:
+        """Returns the number of unread samples."""
+        return min(self._write_total - self._read_total, self.capacity)
+
+    def write(self, frames: np.ndarray):
+        """Copies int16 frames into the ring (producer side)."""
+        n = len(frames)
+        start = self._write_total % self.capacity
+        first = min(n, self.capacity - start)
+        np.copyto(self._data[start:start + first], frames[:first])
+        if first < n:
+            np.copyto(self._data[:n - first], frames[first:])
+        # Publish only after the samples are in place
+        self._write_total += n
+        self._data_ready.set()
+
+    def read(self, n: int, timeout: float, pcm: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Returns the next `n` samples as float32, or None if they don't arrive within `timeout`.
+
+        If `pcm` is given, the same samples are also copied into it as int16.
+        """
+        if self.available() < n:
+            self._data_ready.clear()
+            # Re-check after clearing so a write in between is not missed
+            if self.available() < n and not (self._data_ready.wait(timeout) and self.available() >= n):
+                return None
+
+        # Skip audio that was overwritten while we were behind
+        self._read_total = max(self._read_total, self._write_total - self.capacity)
+
+        start = self._read_total % self.capacity
+        first = min(n, self.capacity - start)
+        out = np.empty(n, dtype=np.float32)
+        out[:first] = self._data[start:start + first]
+        if first < n:
+            out[first:] = self._data[:n - first]
+        if pcm is not None:
+            pcm[:first] = self._data[start:start + first]
+            if first < n:
+                pcm[first:n] = self._data[:n - first]
+        out *= 1.0 / 32768.0
+        self._read_total += n
+        return out
+
 
 class AudioRecorder:
-    def __init__(self, input_device_index: int, sample_rate: int, audio_queue: queue.Queue):
+    def __init__(self, input_device_index: int, sample_rate: int, audio_ring: AudioRingBuffer):
         self.input_device_index = input_device_index
         self.sample_rate = sample_rate
-        self.audio_queue = audio_queue
-        self.stream: Optional[sd.InputStream] = None
+        self.audio_ring = audio_ring
+        self.stream: Optional[sd.RawInputStream] = None
         self.running = False
 
     def start(self):
@@ -18,11 +83,13 @@ class AudioRecorder:
             return
 
         self.running = True
-        self.stream = sd.InputStream(
+        self.stream = sd.RawInputStream(
             device=self.input_device_index,
             samplerate=self.sample_rate,
             channels=1,
-            dtype="float32",
+            dtype="int16",
+            blocksize=AUDIO_BLOCK_SIZE,
+            latency="low",
             callback=self._audio_callback
         )
         self.stream.start()
@@ -31,14 +98,26 @@ class AudioRecorder:
         """Stops the audio recording stream."""
         self.running = False
         if self.stream:
-            self.stream.stop()
+            # Abort drops pending input buffers instead of waiting for them
+            self.stream.abort()
             self.stream.close()
             self.stream = None
 
-    def _audio_callback(self, indata: np.ndarray, frames: int, time: Any, status: Any):
-        """Callback for sounddevice."""
+    def pause(self):
+        """Stops delivering audio but keeps the stream open for a quick resume."""
+        self.running = False
+
+    def resume(self):
+        """Resumes delivering audio, reopening the stream only if it was closed."""
+        if self.stream is None:
+            self.start()
+        else:
+            self.running = True
+
+    def _audio_callback(self, indata: Any, frames: int, time: Any, status: Any):
+        """Callback for sounddevice (raw int16 buffer)."""
         if self.running:
-            self.audio_queue.put(indata.copy())
+            self.audio_ring.write(np.frombuffer(indata, dtype=np.int16))
         if status:
             print(f"Audio status: {status}")
 
@@ -50,3 +129,99 @@ class AudioRecorder:
         except Exception as e:
                 print(f"Error listing audio devices: {e}")
         return []
+
+    @staticmethod
+    def get_device_indices(devices: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Maps device names to their index. The first device with a name wins."""
+        indices: Dict[str, int] = {}
+        for i, device in enumerate(devices):
+            indices.setdefault(device['name'], i)
+        return indices
+
+
+class AudioBuffer:
+    """Preallocated mono float32 buffer that keeps the most recent samples.
+
+    Appends copy only the new frames into place. When the write index reaches
+    the end of the storage, the retained tail is moved back to index 0 once,
+    and the oldest samples are dropped if the buffer is over capacity. A
+    running sum of squares makes rms() O(1) however long the buffer is.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._read_idx = 0
+        self._write_idx = 0
+        self.version = 0  # Bumped whenever the buffered samples change
+        self._sum_squares = 0.0
+
+    def __len__(self) -> int:
+        return self._write_idx - self._read_idx
+
+    def append(self, frames: np.ndarray):
+        """Appends samples, dropping the oldest ones if capacity is exceeded."""
+        n = len(frames)
+        self.version += 1
+        if n >= self.capacity:
+            # Only the most recent `capacity` samples can be kept
+            np.copyto(self._data, frames[-self.capacity:])
+            self._read_idx = 0
+            self._write_idx = self.capacity
+            self._sum_squares = _sum_squares(self._data)
+            return
+
+        if self._write_idx + n > self.capacity:
+            keep = min(len(self), self.capacity - n)
+            start = self._write_idx - keep
+            self._sum_squares -= _sum_squares(self._data[self._read_idx:start])
+            self._data[:keep] = self._data[start:self._write_idx]
+            self._read_idx = 0
+            self._write_idx = keep
+
+        self._data[self._write_idx:self._write_idx + n] = frames
+        self._write_idx += n
+        self._sum_squares += _sum_squares(frames)
+
+    def view(self) -> np.ndarray:
+        """Returns a contiguous, zero-copy view of the buffered samples."""
+        return self._data[self._read_idx:self._write_idx]
+
+    def tail(self, n: int) -> np.ndarray:
+        """Returns a view of the last `n` buffered samples."""
+        return self._data[max(self._read_idx, self._write_idx - n):self._write_idx]
+
+    def rms(self) -> float:
+        """Returns the RMS level of the buffered samples in O(1)."""
+        n = len(self)
+        if n == 0:
+            return 0.0
+        # Clamp float rounding left over from subtracting consumed samples
+        return math.sqrt(max(self._sum_squares, 0.0) / n)
+
+    def tail_rms(self, n: int) -> float:
+        """Returns the RMS level of the last `n` buffered samples."""
+        tail = self.tail(n)
+        if len(tail) == 0:
+            return 0.0
+        return math.sqrt(_sum_squares(tail) / len(tail))
+
+    def consume(self, n: int):
+        """Discards the oldest `n` samples."""
+        self.version += 1
+        n = min(n, len(self))
+        self._sum_squares -= _sum_squares(self._data[self._read_idx:self._read_idx + n])
+        self._read_idx += n
+        if self._read_idx == self._write_idx:
+            self.clear()
+
+    def clear(self):
+        self.version += 1
+        self._read_idx = 0
+        self._write_idx = 0
+        self._sum_squares = 0.0
+
+
+def _sum_squares(samples: np.ndarray) -> float:
+    # A dot product squares and sums in one pass, without a temporary array
+    return float(np.dot(samples, samples))
@@ -1,22 +1,65 @@
 import json
 import os
-from typing import Dict, Any
+import stat
+import uuid
+from typing import Dict, Any, Optional
 
 # Constants
 SAMPLE_RATE = 16000
+MAX_BUFFER_SECONDS = 30
+AUDIO_BLOCK_SIZE = 512  # Frames per capture callback (32 ms, one Silero-VAD frame)
+SPEECH_QUEUE_MAXSIZE = SAMPLE_RATE // AUDIO_BLOCK_SIZE  # ~1 s between VAD and ASR
+COMMIT_QUEUE_MAXSIZE = 2  # Utterances waiting for the quality model
+# Preferred mlx-community weights suffix per model, falls back to full precision.
+# Previews run every second, so the fast model is quantized; commits are what
+# ends up in the transcript, so the quality model keeps full precision.
+FAST_MODEL_QUANTIZATION = "q4"
+QUALITY_MODEL_QUANTIZATION = None
+WHISPER_COMPILE = False  # Fuse the Whisper encoder with mx.compile (first call pays the trace)
+# LLM decoding is bound by weight bandwidth, so default to the smallest model
+# that translates well; larger ones remain selectable in the settings
+DEFAULT_TRANSLATION_MODEL = "mlx-community/Llama-3.2-1B-Instruct-4bit"
 LOG_FILE = "transcriptions.txt"
 CONFIG_FILE = "config.json"
+TRANSLATION_CACHE_FILE = "translation_cache.json"  # Saved translations, per model
+TRANSLATION_CACHE_TTL = 7 * 24 * 3600  # Seconds a saved translation is reused
+TRANSLATION_CACHE_SAVE_DELAY = 5.0  # Seconds new translations wait to be written together
+
+def write_json_atomic(path: str, data: Any, indent: Optional[int] = None) -> None:
+    """Writes JSON to a temp file beside `path` and swaps it in, so a crash
+    mid-write never leaves a truncated file behind."""
+    directory = os.path.dirname(os.path.abspath(path))
+    # Keep an existing file's mode; a new one gets 0o666 minus the umask,
+    # applied by the kernel at creation
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = None
+    tmp_path = os.path.join(directory, f".{os.path.basename(path)}-{os.getpid()}-{uuid.uuid4().hex}")
+    fd = os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+    try:
+        with os.fdopen(fd, "w") as f:
+            if mode is not None:
+                os.fchmod(f.fileno(), mode)
+            f.write(json.dumps(data, indent=indent))
+            # The data must be on disk before the rename, or a power loss
+            # can keep the rename and lose the contents
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 class ConfigManager:
     @staticmethod
     def load_config() -> Dict[str, Any]:
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, "r") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return {}
-        return {}
+        # Open directly rather than stat first: a missing file is just an IOError
+        try:
+            with open(CONFIG_FILE, "r") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return {}
 
     @staticmethod
     def save_config(
@@ -24,7 +67,7 @@ class ConfigManager:
         model_size: str, 
         language: str, 
         translation_lang: str = "en", 
-        translation_model: str = "mlx-community/gemma-2-2b-it-4bit"
+        translation_model: str = DEFAULT_TRANSLATION_MODEL
     ) -> None:
         config = {
             "device_name": device_name,
@@ -33,6 +76,5 @@ class ConfigManager:
             "translation_lang": translation_lang,
             "translation_model": translation_model
         }
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(config, f, indent=4)
+        write_json_atomic(CONFIG_FILE, config, indent=4)
 
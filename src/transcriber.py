@@ -1,26 +1,80 @@
 import numpy as np
+import mlx.core as mx
 import mlx_whisper
+from mlx_whisper.audio import log_mel_spectrogram, pad_or_trim, N_FRAMES, N_SAMPLES
+from mlx_whisper.decoding import DecodingOptions, decode
+from mlx_whisper.load_models import load_model
+from mlx_whisper.transcribe import ModelHolder
 import time
 import threading
 import queue
-import os
-from typing import Callable, Optional
-from .config import SAMPLE_RATE
-from .utils import log_to_file
-import sounddevice as sd  # Used for sleep
+from typing import Callable, Dict, Optional, Tuple
+from .config import (
+    SAMPLE_RATE, MAX_BUFFER_SECONDS, SPEECH_QUEUE_MAXSIZE, COMMIT_QUEUE_MAXSIZE, WHISPER_COMPILE,
+    FAST_MODEL_QUANTIZATION, QUALITY_MODEL_QUANTIZATION
+)
+from .audio_handler import AudioBuffer, AudioRingBuffer
+from .vad import VoiceActivityDetector, END_OF_SPEECH
+from .utils import log_to_file, gpu_lock
+
+# Loaded models by size and quantization, shared across Transcriber restarts
+_models: Dict[Tuple[str, Optional[str]], Tuple[str, object]] = {}
+
+# Repos that already ran a warm-up pass in this process
+_warmed_up = set()
+
+# Sent as the text of a preview update when an utterance is handed to the
+# refine thread: the UI keeps that utterance's preview until its final arrives
+REFINING = None
+
+def compile_encoder(model) -> None:
+    """Replaces the model's encoder call with a compiled one.
+
+    The encoder always sees a single (1, N_FRAMES, n_mels) window, so it is
+    traced once and then runs as a fused graph. The decoder is left alone: its
+    KV cache grows every token, which would force a retrace per step.
+    """
+    encoder = model.encoder
+    # Weights are passed as inputs rather than captured as graph constants;
+    # the compiled function keeps the encoder module alive.
+    model.encoder = mx.compile(encoder.__call__, inputs=encoder.state)
+
+def load_whisper_model(size: str, quantization: Optional[str] = None) -> Tuple[str, object]:
+    """Loads an MLX Whisper model once, preferring `quantization` weights if given.
+
+    Returns the repo the weights came from and the model.
+    """
+    key = (size, quantization)
+    if key not in _models:
+        repos = [f"mlx-community/whisper-{size}-mlx"]
+        if quantization:
+            repos.insert(0, f"mlx-community/whisper-{size}-mlx-{quantization}")
+        for repo in repos:
+            try:
+                model = load_model(repo, dtype=mx.float16)
+                if WHISPER_COMPILE:
+                    compile_encoder(model)
+                _models[key] = (repo, model)
+                print(f"📦 Loaded {repo}")
+                break
+            except Exception as e:
+                if repo == repos[-1]:
+                    raise
+                print(f"⚠️ Could not load {repo} ({e}), trying full precision...")
+    return _models[key]
 
 class Transcriber:
     def __init__(
         self, 
         model_size: str, 
         language: str, 
-        audio_queue: queue.Queue, 
-        update_callback: Callable[[str, bool], None], 
+        audio_ring: AudioRingBuffer, 
+        update_callback: Callable[[Optional[str], bool], None], 
         status_callback: Callable[[str], None]
     ):
         self.model_size = model_size
         self.language = language
-        self.audio_queue = audio_queue
+        self.audio_ring = audio_ring
         self.update_callback = update_callback
         self.status_callback = status_callback
         
@@ -28,26 +82,74 @@ class Transcriber:
         self.stop_event = threading.Event()
         self.pause_event = threading.Event()
         self.transcription_paused = threading.Event()
+        self.wake_event = threading.Event()  # Set by resume()/stop() to wake a paused loop
         
         # Configuration
         self.silence_threshold = 0.01
         self.min_duration = 2.0
         self.max_duration = 15.0 
         self.update_interval = 1
+        self.commit_margin = 0.5  # Seconds kept uncommitted when forced to commit mid-speech
+        self.max_samples = int(self.max_duration * SAMPLE_RATE)
+        self.min_samples = int(self.min_duration * SAMPLE_RATE)
+        self.idle_wait = 0.25  # Longest wait for speech before re-checking stop/pause
+        self.silence_tail_samples = int(0.5 * SAMPLE_RATE)
+        
+        # Pipeline: capture ring -> VAD thread -> speech queue -> ASR thread
+        #           -> commit queue -> refine thread (quality model)
+        self.speech_queue = queue.Queue(maxsize=SPEECH_QUEUE_MAXSIZE)
+        self.vad = VoiceActivityDetector(audio_ring, self.speech_queue, threshold=self.silence_threshold)
+        self.commit_queue = queue.Queue(maxsize=COMMIT_QUEUE_MAXSIZE)
+        self.commit_lock = threading.Lock()
+        self.commit_thread: Optional[threading.Thread] = None
         
         # State
-        self.local_audio_buffer = np.zeros((0, 1), dtype=np.float32)
+        self.local_audio_buffer = AudioBuffer(SAMPLE_RATE * MAX_BUFFER_SECONDS)
         self.last_transcribe_time = 0
+        self.previewed_version = None  # Buffer version the last preview decoded
+        # Tail of the committed transcript, kept no longer than the prompt
+        # it is used as
         self.last_committed_text = ""
+        self.prompt_chars = 200
+        # Normalized prompt, for spotting previews that just echo it
+        self.prompt_lower = ""
+        self.preview_visible = False
+        # Words of the current preview that the next one is decoded after
+        self.preview_prefix = ""
+        self.speech_ended = False
+        # In auto mode, the language the quality model last detected. Previews
+        # reuse it instead of paying for language detection on every call.
+        self.detected_language = None
+        
+        # Models (loaded on the transcription thread)
+        self.fast_model = None
+        self.quality_model = None
+        
+        # Previews with a higher no-speech probability are dropped
+        self.no_speech_threshold = 0.6
+        # Reused zero-padded 30 s window that previews are staged into
+        self.preview_window = np.zeros(N_SAMPLES, dtype=np.float32)
         
-        # Models
-        self.fast_model_path = "mlx-community/whisper-tiny-mlx"
-        self.quality_model_path = f"mlx-community/whisper-{model_size}-mlx"
+        # Fixed transcribe() options for commits, built once. verbose=None
+        # (not False) keeps mlx_whisper from printing and drawing a tqdm bar.
+        self.commit_options = dict(
+            language=self.language,
+            verbose=None,
+            temperature=0.0,
+            condition_on_previous_text=True
+        )
 
     def start(self):
         """Starts the transcription loop in a separate thread."""
         self.running = True
         self.stop_event.clear()
+        self.wake_event.clear()
+        self.vad.start()
+        with self.commit_lock:
+            # A refine thread still finishing from before stop() carries on
+            if self.commit_thread is None:
+                self.commit_thread = threading.Thread(target=self._commit_loop, daemon=True)
+                self.commit_thread.start()
         self.thread = threading.Thread(target=self._run_loop, daemon=True)
         self.thread.start()
 
@@ -55,9 +157,21 @@ class Transcriber:
         """Stops the transcription loop."""
         self.running = False
         self.stop_event.set()
+        self.wake_event.set()
+        self.vad.stop()
         if hasattr(self, 'thread') and self.thread.is_alive():
             self.thread.join(timeout=1.0)
 
+    def wait_stopped(self, timeout: float) -> bool:
+        """After stop(), waits up to `timeout` for the ASR thread and for the
+        refine thread to drain the commit queue. Returns True if both ended."""
+        deadline = time.monotonic() + timeout
+        with self.commit_lock:
+            threads = [t for t in (getattr(self, 'thread', None), self.commit_thread) if t is not None]
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        return not any(t.is_alive() for t in threads)
+
     def pause(self):
         """Pauses transcription (e.g., during translation)."""
         self.pause_event.set()
@@ -65,46 +179,68 @@ class Transcriber:
     def resume(self):
         """Resumes transcription."""
         self.pause_event.clear()
+        self.wake_event.set()
 
     def is_paused(self) -> bool:
         """Returns True if the transcriber is currently paused."""
         return self.transcription_paused.is_set()
 
+    def wait_paused(self, timeout: float) -> bool:
+        """Blocks until the loop has actually paused. Returns False on timeout."""
+        return self.transcription_paused.wait(timeout)
+
     def _run_loop(self):
         """Main transcription loop."""
-        self.status_callback("Ready to transcribe")
         print(f"✅ Starting MLX Whisper (Fast: tiny, Quality: {self.model_size})...")
-        os.environ["TQDM_DISABLE"] = "1"
+        try:
+            self.fast_model = load_whisper_model("tiny", FAST_MODEL_QUANTIZATION)
+            self.quality_model = load_whisper_model(self.model_size, QUALITY_MODEL_QUANTIZATION)
+        except Exception as e:
+            print(f"❌ Failed to load Whisper models: {e}")
+            self.status_callback(f"❌ Failed to load Whisper models: {e}")
+            return
+        self._warm_up()
+        self.status_callback("Ready to transcribe")
 
         while not self.stop_event.is_set():
             # Check for pause event
             if self.pause_event.is_set():
+                # Let queued refinements finish so the caller gets the GPU to itself
+                self.commit_queue.join()
                 self.transcription_paused.set() 
-                sd.sleep(100)
+                self.wake_event.wait()
+                self.wake_event.clear()
                 continue
             else:
                 self.transcription_paused.clear()
 
-            # 1. Drain Queue
-            while not self.audio_queue.empty():
-                try:
-                    data = self.audio_queue.get_nowait()
-                    self.local_audio_buffer = np.concatenate([self.local_audio_buffer, data])
-                except queue.Empty:
-                    break
+            # 1. Drain speech queue
+            self._drain_speech_queue()
 
             current_duration = len(self.local_audio_buffer) / SAMPLE_RATE
             now = time.time()
 
-            # 2. Transcribe?
-            if current_duration >= self.min_duration and (now - self.last_transcribe_time > self.update_interval):
+            # 2. Transcribe? (immediately once the VAD reports the end of an utterance)
+            if self.speech_ended and current_duration == 0:
+                self.speech_ended = False
+            elif self.speech_ended or (current_duration >= self.min_duration and (now - self.last_transcribe_time > self.update_interval)):
                 
-                # Optimization: Skip if silence
-                rms = np.sqrt(np.mean(self.local_audio_buffer**2))
-                if rms < self.silence_threshold and current_duration < self.max_duration:
-                    # Clear pending text if silence is detected
-                    self.update_callback("", False)
-                    sd.sleep(50)
+                # No new speech since the last preview: decoding would repeat it
+                if not self.speech_ended and self.local_audio_buffer.version == self.previewed_version:
+                    self.last_transcribe_time = now
+                    continue
+
+                # Optimization: Skip if silence. A neural VAD already judged
+                # these blocks as speech, so quiet talkers aren't gated on RMS
+                rms = self.local_audio_buffer.rms()
+                if not self.vad.is_neural and rms < self.silence_threshold and current_duration < self.max_duration:
+                    if self.speech_ended:
+                        self._discard_utterance()
+                    else:
+                        self._clear_preview()
+                    # Counts as a tick, so the next drain waits a full interval
+                    # instead of polling the queue with a zero timeout
+                    self.last_transcribe_time = now
                     continue
 
                 try:
@@ -113,61 +249,227 @@ class Transcriber:
 
                 except Exception as e:
                     print(f"\n⚠️ Transcription error: {e}")
-            
-            sd.sleep(50)
+
+                if self.speech_ended:
+                    # Nothing committable was heard (e.g. noise): drop it
+                    self._discard_utterance()
+
+    def _warm_up(self):
+        """Runs both models once on silence so the first caption does not pay
+        for Metal kernel setup (and the encoder trace when compiled)."""
+        silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        try:
+            if self.fast_model[0] not in _warmed_up:
+                self._preview(silence, " ")
+                _warmed_up.add(self.fast_model[0])
+            if self.quality_model[0] not in _warmed_up:
+                self._transcribe(
+                    self.quality_model,
+                    silence,
+                    language=self.language,
+                    verbose=None,
+                    temperature=0.0,
+                    condition_on_previous_text=False
+                )
+                _warmed_up.add(self.quality_model[0])
+        except Exception as e:
+            print(f"⚠️ Model warm-up failed: {e}")
+
+    def _drain_speech_queue(self):
+        """Moves pending speech into the buffer, stopping at the end of an utterance."""
+        # Wait for speech, but no longer than the next scheduled transcription
+        timeout = self.idle_wait
+        if len(self.local_audio_buffer) >= self.min_samples:
+            next_tick = self.last_transcribe_time + self.update_interval - time.time()
+            timeout = min(max(next_tick, 0.0), timeout)
+        try:
+            item = self.speech_queue.get(timeout=timeout)
+            while self._receive(item):
+                item = self.speech_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+        # Behind real time (e.g. after a long transcription): keep pulling while
+        # capture has a backlog so one Whisper call covers it, instead of one
+        # call per speech-queue-full of audio
+        while not self.speech_ended and self.audio_ring.available() and len(self.local_audio_buffer) < self.max_samples:
+            try:
+                if not self._receive(self.speech_queue.get(timeout=0.05)):
+                    break
+            except queue.Empty:
+                break
+
+    def _receive(self, item) -> bool:
+        """Appends a block from the VAD stage. Returns False at the end of an utterance."""
+        if item is END_OF_SPEECH:
+            self.speech_ended = True
+            return False
+        self.local_audio_buffer.append(item)
+        return True
+
+    def _clear_preview(self):
+        # Clear pending text (once, not on every block)
+        if self.preview_visible:
+            self.update_callback("", False)
+            self.preview_visible = False
+
+    def _discard_utterance(self):
+        self.local_audio_buffer.clear()
+        self.preview_prefix = ""
+        self.speech_ended = False
+        self._clear_preview()
+
+    @staticmethod
+    def _transcribe(model: Tuple[str, object], audio: np.ndarray, **kwargs) -> dict:
+        # mlx_whisper caches a single model by repo, so alternating the fast and
+        # quality models would reload weights on every switch. Pin ours instead.
+        repo, whisper_model = model
+        with gpu_lock:
+            ModelHolder.model = whisper_model
+            ModelHolder.model_path = repo
+            return mlx_whisper.transcribe(audio, path_or_hf_repo=repo, **kwargs)
+
+    def _preview(self, audio: np.ndarray, prompt: str, prefix: str = "") -> str:
+        """Decodes the buffer as a single 30 s window with the fast model.
+
+        A preview always fits in one Whisper window, so this skips
+        transcribe()'s seek loop and the extra 30 s of zeros it pads every
+        call with: the mel is computed once over exactly N_SAMPLES and handed
+        straight to the decoder. Previews are throwaway, so there are no
+        timestamp tokens and no temperature fallback.
+
+        `prefix` is text already previewed for this audio. It is fed to the
+        decoder in one pass instead of being generated token by token again,
+        and the returned text includes it.
+        """
+        _, model = self.fast_model
+        # Stage into the padded window on the host: one transfer to MLX per
+        # preview instead of an upload plus an mx.pad copy
+        n = min(len(audio), N_SAMPLES)
+        window = self.preview_window
+        window[:n] = audio[-n:]
+        window[n:] = 0
+
+        options = DecodingOptions(
+            language=self.language or self.detected_language,
+            prompt=prompt,
+            prefix=prefix or None,
+            temperature=0.0,
+            without_timestamps=True
+        )
+        with gpu_lock:
+            mel = log_mel_spectrogram(mx.array(window), n_mels=model.dims.n_mels)
+            mel = pad_or_trim(mel, N_FRAMES, axis=-2).astype(mx.float16)
+            result = decode(model, mel, options)
+        if result.no_speech_prob > self.no_speech_threshold:
+            return ""
+        return f"{prefix} {result.text}" if prefix else result.text
 
     def _process_audio_buffer(self, current_duration: float):
         # Context Prompting
-        prompt = self.last_committed_text[-200:] if self.last_committed_text else " "
+        prompt = self.last_committed_text or " "
         
+        audio = self.local_audio_buffer.view()
+        self.previewed_version = self.local_audio_buffer.version
+
         # Transcribe with FAST model for preview/logic
-        result_fast = mlx_whisper.transcribe(
-            self.local_audio_buffer.flatten(),
-            path_or_hf_repo=self.fast_model_path,
-            language=self.language,
-            verbose=False,
-            temperature=0.0,
-            condition_on_previous_text=True,
-            initial_prompt=prompt
-        )
-        text = result_fast["text"].strip()
+        text = self._preview(audio, prompt, self.preview_prefix).strip()
         
-        # Anti-Hallucination
-        if text.lower() == prompt.strip().lower():
+        # Anti-Hallucination (string equality rejects different lengths at once)
+        if text.lower() == self.prompt_lower:
             text = ""
 
+        # The next preview only decodes past these words. The last word is
+        # left out: it may have been cut off mid-utterance.
+        self.preview_prefix = text.rsplit(" ", 1)[0] if " " in text else ""
+
         if text:
             # Smart Commit Logic
             is_sentence_end = text.endswith((".", "!", "?"))
             
             # Check for silence at the end
-            last_chunk_len = int(0.5 * SAMPLE_RATE)
-            if len(self.local_audio_buffer) > last_chunk_len:
-                last_chunk = self.local_audio_buffer[-last_chunk_len:]
-                is_silence_end = np.sqrt(np.mean(last_chunk**2)) < self.silence_threshold
+            if len(audio) > self.silence_tail_samples:
+                is_silence_end = self.local_audio_buffer.tail_rms(self.silence_tail_samples) < self.silence_threshold
             else:
                 is_silence_end = True # Assume silence if buffer is short (though min duration check passed)
 
-            should_commit = (is_sentence_end and is_silence_end) or (current_duration > self.max_duration)
+            is_natural_end = (is_sentence_end and is_silence_end) or self.speech_ended
             
-            if should_commit:
-                self._commit_text(prompt)
+            if is_natural_end:
+                self._commit_text()
+            elif current_duration > self.max_duration:
+                # Still speaking: commit finished segments, keep the rest
+                self._commit_text(slice_tail=True)
             else:
                 self.update_callback(text, False) # Preview
+                self.preview_visible = True
+
+    def _commit_text(self, slice_tail: bool = False):
+        if slice_tail:
+            # How much audio to consume depends on the refined segments, so
+            # refine here, after any queued utterances to keep the transcript
+            # in order
+            self.commit_queue.join()
+            commit_samples = self._refine(self.local_audio_buffer.view(), slice_tail=True)
+            self.local_audio_buffer.consume(commit_samples)
+        else:
+            # Hand the whole utterance to the refine thread and keep
+            # previewing new speech meanwhile. REFINING tells the UI to keep
+            # this utterance's preview apart from newer previews until its
+            # final text (one per queued utterance, in order) replaces it.
+            # If the quality model falls this far behind, block: the backlog
+            # then lands in the capture ring, which drops the oldest audio
+            # instead of growing.
+            self.update_callback(REFINING, False)
+            self.commit_queue.put(self.local_audio_buffer.view().copy())
+            self.local_audio_buffer.clear()
+        self.preview_visible = False
+        self.preview_prefix = ""
+
+    def _commit_loop(self):
+        """Refines committed utterances with the quality model, in order."""
+        # Its own stream keeps refinement work from queueing behind previews
+        stream = mx.new_stream(mx.default_device())
+        while True:
+            try:
+                audio = self.commit_queue.get(timeout=self.idle_wait)
+            except queue.Empty:
+                with self.commit_lock:
+                    if self.stop_event.is_set() and self.commit_queue.empty():
+                        self.commit_thread = None
+                        return
+                continue
+            try:
+                with mx.stream(stream):
+                    self._refine(audio)
+            except Exception as e:
+                print(f"\n⚠️ Transcription error: {e}")
+                # Every REFINING needs its final, or later ones would
+                # replace the wrong preview
+                self.update_callback("", True)
+            finally:
+                self.commit_queue.task_done()
+
+    def _refine(self, audio: np.ndarray, slice_tail: bool = False) -> int:
+        """Transcribes audio with the quality model and emits the final text.
+
+        Returns the number of samples the committed text covers.
+        """
+        # Built here, not when the commit was queued, so it includes the
+        # utterances refined just before this one
+        prompt = self.last_committed_text or " "
 
-    def _commit_text(self, prompt: str):
         # RE-TRANSCRIBE with QUALITY model
         print("✨ Refining with quality model...")
-        result_quality = mlx_whisper.transcribe(
-            self.local_audio_buffer.flatten(),
-            path_or_hf_repo=self.quality_model_path,
-            language=self.language,
-            verbose=False,
-            temperature=0.0,
-            condition_on_previous_text=True,
-            initial_prompt=prompt
+        result_quality = self._transcribe(
+            self.quality_model,
+            audio,
+            initial_prompt=prompt,
+            **self.commit_options
         )
         text_quality = result_quality["text"].strip()
+        if self.language is None:
+            self.detected_language = result_quality.get("language")
         
         # Use quality text if valid, else fallback
         # Assuming we have the 'text' from fast model available? 
@@ -176,13 +478,23 @@ class Transcriber:
         # It's safer to trust quality model or re-use fast if quality fails (unlikely here).
         
         final_text = text_quality # Simply trust quality model
+        commit_samples = len(audio)
+        
+        if slice_tail:
+            # Commit-and-slice: only commit segments that ended before the
+            # margin so the word being spoken is not cut in half
+            horizon = len(audio) / SAMPLE_RATE - self.commit_margin
+            segments = [seg for seg in result_quality["segments"] if seg["end"] <= horizon]
+            if segments:
+                final_text = "".join(seg["text"] for seg in segments).strip()
+                commit_samples = int(segments[-1]["end"] * SAMPLE_RATE)
         
         print(f"📝 {final_text}")
         log_to_file(final_text)
         self.update_callback(final_text, True) # Final
         
-        self.last_committed_text += " " + final_text
-        if len(self.last_committed_text) > 1000: 
-            self.last_committed_text = self.last_committed_text[-1000:]
+        # One bounded slice per commit; prompts then use it as is
+        self.last_committed_text = (self.last_committed_text + " " + final_text)[-self.prompt_chars:]
+        self.prompt_lower = self.last_committed_text.strip().lower()
         
-        self.local_audio_buffer = np.zeros((0, 1), dtype=np.float32)
+        return commit_samples
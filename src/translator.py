@@ -0,0 +1,276 @@
+import collections
+import copy
+import inspect
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import (
+    TRANSLATION_CACHE_FILE,
+    TRANSLATION_CACHE_TTL,
+    TRANSLATION_CACHE_SAVE_DELAY,
+    write_json_atomic,
+)
+from .utils import gpu_lock
+
+LANGUAGE_NAMES = {
+    "en": "English", "es": "Spanish", "fr": "French",
+    "de": "German", "it": "Italian", "pt": "Portuguese"
+}
+
+SYSTEM_PROMPT = (
+    "You are a professional interpreter. Translate the exact text provided below into {language}. "
+    "Translate every single sentence found in the input. Do not summarize, do not omit any details. "
+    "Do not add explanations, just output the translation."
+)
+
+# Stands in for the segment text when the chat template is split in two
+_TEXT_MARKER = "<<SEGMENT_TEXT>>"
+
+_translator = None
+_translator_lock = threading.Lock()
+_cache_file_lock = threading.Lock()
+
+def _read_cache_file() -> Dict[str, Any]:
+    try:
+        with open(TRANSLATION_CACHE_FILE, "r") as f:
+            saved = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+    return saved if isinstance(saved, dict) else {}
+
+class Translator:
+    """Click-to-translate LLM (mlx_lm), loaded once and reused across clicks.
+
+    Only the segment text changes between translations into one language, so
+    the chat template is rendered once per language and split around it. The
+    part before the text (system prompt and turn headers) is prefilled into a
+    KV cache once; each translation starts from a copy of that cache and only
+    prefills the segment and the assistant header.
+    """
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.model = None
+        self.tokenizer = None
+        self.load_lock = threading.Lock()
+        self.warmed_up = False
+        # (target language, text) -> (translation, time translated), least
+        # recently used first. Live captions repeat phrases, and a hit skips
+        # the LLM entirely. Saved across sessions in TRANSLATION_CACHE_FILE.
+        self.cache_size = 512
+        self.cache_lock = threading.Lock()
+        self.cache = self._load_cache()
+        # Pending save of new entries; None while the file is up to date
+        self.save_timer: Optional[threading.Timer] = None
+        # Target language -> (prefilled prompt-prefix cache, suffix token ids)
+        self._prompts: Dict[str, Tuple[List[Any], List[int]]] = {}
+
+    def load(self, warm_up_lang: Optional[str] = None):
+        """Loads the model and tokenizer if they are not loaded yet.
+
+        With `warm_up_lang`, also prefills that language's prompt and
+        generates one token, so Metal kernel compilation and buffer
+        allocation happen here rather than on the first click.
+        """
+        with self.load_lock:
+            if self.model is None:
+                from mlx_lm import load
+                self.model, self.tokenizer = load(self.model_name)
+            if warm_up_lang is not None and not self.warmed_up:
+                # Runs beside Whisper loading and warming up, so it takes the
+                # same GPU lock as every other model call
+                with gpu_lock:
+                    self._generate("Hello", warm_up_lang, max_tokens=1)
+                self.warmed_up = True
+
+    def translate(
+        self,
+        text: str,
+        target_lang: str,
+        on_partial: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """Translates one caption segment into `target_lang`.
+
+        `on_partial` is called with the translation so far after each token.
+        """
+        self.load()
+        with gpu_lock:
+            translation = self._generate(text, target_lang, on_partial)
+        self._store(text, target_lang, translation)
+        return translation
+
+    def translate_batch(self, texts: List[str], target_lang: str) -> List[str]:
+        """Translates several segments in one batched decode.
+
+        Every sequence starts from the same prefilled prompt prefix, so only
+        the segments and assistant headers are prefilled, together.
+        """
+        try:
+            from mlx_lm import batch_generate
+        except ImportError:
+            batch_generate = None
+        if batch_generate is None or "prompt_caches" not in inspect.signature(batch_generate).parameters:
+            # mlx-lm before batched prompt caches: translate one at a time
+            return [self.translate(text, target_lang) for text in texts]
+        from mlx_lm.sample_utils import make_sampler
+
+        self.load()
+        with gpu_lock:
+            prefix_cache, suffix_ids = self._prompt(target_lang)
+            prompts = [
+                self.tokenizer.encode(f"'''{text}'''", add_special_tokens=False) + suffix_ids
+                for text in texts
+            ]
+            response = batch_generate(
+                self.model,
+                self.tokenizer,
+                prompts,
+                # Batching merges these into a new cache, leaving the prefix intact
+                prompt_caches=[prefix_cache] * len(texts),
+                max_tokens=500,
+                sampler=make_sampler(temp=0.1)
+            )
+        translations = [translation.strip() for translation in response.texts]
+        for text, translation in zip(texts, translations):
+            self._store(text, target_lang, translation)
+        return translations
+
+    def cached(self, text: str, target_lang: str) -> Optional[str]:
+        """Returns a previous translation of `text`, or None once it has
+        outlived TRANSLATION_CACHE_TTL."""
+        with self.cache_lock:
+            entry = self.cache.get((target_lang, text))
+            if entry is None:
+                return None
+            if entry[1] < time.time() - TRANSLATION_CACHE_TTL:
+                del self.cache[(target_lang, text)]
+                return None
+            self.cache.move_to_end((target_lang, text))
+            return entry[0]
+
+    def _store(self, text: str, target_lang: str, translation: str):
+        with self.cache_lock:
+            self.cache[(target_lang, text)] = (translation, time.time())
+            self.cache.move_to_end((target_lang, text))
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            # Written later off the translation path, batched with any
+            # translations that follow
+            if self.save_timer is None:
+                self.save_timer = threading.Timer(TRANSLATION_CACHE_SAVE_DELAY, self.flush_cache)
+                self.save_timer.daemon = True
+                self.save_timer.start()
+
+    def _load_cache(self) -> collections.OrderedDict:
+        """Reads this model's saved translations, skipping expired ones."""
+        cache = collections.OrderedDict()
+        cutoff = time.time() - TRANSLATION_CACHE_TTL
+        with _cache_file_lock:
+            entries = _read_cache_file().get(self.model_name, [])
+        if not isinstance(entries, list):
+            print("⚠️ Ignoring malformed translation cache")
+            return cache
+        try:
+            for target_lang, text, translation, translated_at in entries[-self.cache_size:]:
+                if translated_at >= cutoff:
+                    cache[(target_lang, text)] = (translation, translated_at)
+        except (TypeError, ValueError):
+            print("⚠️ Ignoring malformed translation cache")
+            cache.clear()
+        return cache
+
+    def flush_cache(self):
+        """Writes new translations to TRANSLATION_CACHE_FILE, if there are any."""
+        with self.cache_lock:
+            if self.save_timer is None:
+                return
+            self.save_timer.cancel()
+            self.save_timer = None
+            entries = [
+                [target_lang, text, translation, translated_at]
+                for (target_lang, text), (translation, translated_at) in self.cache.items()
+            ]
+        # Other models' entries are kept, so switching models loses nothing
+        with _cache_file_lock:
+            saved = _read_cache_file()
+            saved[self.model_name] = entries
+            try:
+                write_json_atomic(TRANSLATION_CACHE_FILE, saved)
+            except OSError as e:
+                print(f"⚠️ Could not save translation cache: {e}")
+
+    def _generate(
+        self,
+        text: str,
+        target_lang: str,
+        on_partial: Optional[Callable[[str], None]] = None,
+        max_tokens: int = 500
+    ) -> str:
+        from mlx_lm import stream_generate
+        from mlx_lm.sample_utils import make_sampler
+
+        prefix_cache, suffix_ids = self._prompt(target_lang)
+        prompt = self.tokenizer.encode(f"'''{text}'''", add_special_tokens=False) + suffix_ids
+
+        translation = ""
+        for response in stream_generate(
+            self.model,
+            self.tokenizer,
+            prompt=prompt,
+            max_tokens=max_tokens,
+            sampler=make_sampler(temp=0.1),
+            # Generation extends the cache in place, so work on a copy
+            prompt_cache=copy.deepcopy(prefix_cache)
+        ):
+            translation += response.text
+            if on_partial is not None:
+                on_partial(translation)
+        return translation.strip()
+
+    def _prompt(self, target_lang: str) -> Tuple[List[Any], List[int]]:
+        if target_lang not in self._prompts:
+            import mlx.core as mx
+            from mlx_lm.models.cache import make_prompt_cache
+
+            language = LANGUAGE_NAMES.get(target_lang, target_lang)
+            messages = [
+                {"role": "system", "content": SYSTEM_PROMPT.format(language=language)},
+                {"role": "user", "content": _TEXT_MARKER}
+            ]
+            rendered = self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+            prefix, suffix = rendered.split(_TEXT_MARKER)
+
+            # Same BOS handling as mlx_lm applies to a string prompt
+            bos = self.tokenizer.bos_token
+            prefix_ids = self.tokenizer.encode(prefix, add_special_tokens=bos is None or not prefix.startswith(bos))
+
+            cache = make_prompt_cache(self.model)
+            if prefix_ids:
+                self.model(mx.array(prefix_ids)[None], cache=cache)
+                mx.eval([c.state for c in cache])
+            self._prompts[target_lang] = (cache, self.tokenizer.encode(suffix, add_special_tokens=False))
+        return self._prompts[target_lang]
+
+def get_translator(model_name: str) -> Translator:
+    """Returns the process-wide translator, replacing it if `model_name` changed."""
+    global _translator
+    with _translator_lock:
+        if _translator is None or _translator.model_name != model_name:
+            if _translator is not None:
+                _translator.flush_cache()
+            _translator = Translator(model_name)
+        return _translator
+
+def preload_translator(model_name: str, target_lang: str):
+    """Starts loading and warming up the translator on a background thread."""
+    translator = get_translator(model_name)
+
+    def load():
+        try:
+            translator.load(warm_up_lang=target_lang)
+        except Exception:
+            pass  # The caption window retries and reports the error
+
+    threading.Thread(target=load, daemon=True).start()
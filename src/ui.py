@@ -1,15 +1,17 @@
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
-import datetime
-import queue
 import time
+import queue
+import itertools
+import collections
 from typing import Optional
 
-from .config import ConfigManager
-from .audio_handler import AudioRecorder
-from .transcriber import Transcriber
-from screeninfo import get_monitors
+from .config import ConfigManager, SAMPLE_RATE, MAX_BUFFER_SECONDS, DEFAULT_TRANSLATION_MODEL
+from .audio_handler import AudioRecorder, AudioRingBuffer
+from .translator import get_translator, preload_translator
+from .utils import flush_log
 
 class CaptionWindow:
     def __init__(
@@ -19,7 +21,7 @@ class CaptionWindow:
         device_name: str, 
         language: str, 
         translation_lang: str = "en", 
-        translation_model: str = "mlx-community/Llama-3.2-1B-Instruct-4bit"
+        translation_model: str = DEFAULT_TRANSLATION_MODEL
     ):
         print("🔧 Initializing CaptionWindow UI...")
         try:
@@ -39,26 +41,36 @@ class CaptionWindow:
         # Translation State
         self.translation_lang = translation_lang
         self.translation_model_name = translation_model
-        self.translation_model = None
-        self.translation_tokenizer = None
+        self.translator = get_translator(translation_model)
         self.is_translating = False
+        self.translation_redraw_interval = 0.05  # Seconds between streamed translation redraws
         
         # Track active translations to prevent double-clicks
         self.active_translations = set()
+        # Clicked segments waiting for the translation worker
+        self.translation_queue = queue.Queue()
+        self.translation_batch_window = 0.05  # Seconds to wait for more clicks after the first
+        
+        # Text updates posted by the transcriber, drawn together on idle
+        self.text_updates = []
+        self.text_updates_lock = threading.Lock()
+        self.text_flush_scheduled = False
         
         # Core Components
-        self.audio_queue = queue.Queue()
-        self.audio_recorder = AudioRecorder(device_index, 16000, self.audio_queue)
+        self.audio_ring = AudioRingBuffer(SAMPLE_RATE * MAX_BUFFER_SECONDS)
+        self.audio_recorder = AudioRecorder(device_index, 16000, self.audio_ring)
         
         self.model_size = model_size
         self.device_index = device_index
         self.device_name = device_name
         self.language = language if language != "auto" else None
         
+        # Imported here so the settings window can open without loading MLX
+        from .transcriber import Transcriber
         self.transcriber = Transcriber(
             model_size=self.model_size,
             language=self.language,
-            audio_queue=self.audio_queue,
+            audio_ring=self.audio_ring,
             update_callback=self.schedule_update_text,
             status_callback=self.schedule_set_status
         )
@@ -66,9 +78,27 @@ class CaptionWindow:
         # Window Dimensions (initial hint)
         self._setup_window_geometry()
 
-        self.last_text_time = datetime.datetime.now()
+        self.last_text_time = time.monotonic()
         self.paragraph_threshold = 2.0
         self.segment_separator = " • " 
+        
+        # Committed segment tags, oldest first; history beyond this is dropped
+        # so the Text widget and its tags don't grow for the whole session
+        self.segments = collections.deque()
+        # Unique segment tag numbers; timestamps could collide within a millisecond
+        self.segment_ids = itertools.count()
+        self.max_segments = 100
+        
+        # Last character of committed text, so update_text can pick a
+        # separator without reading it back from the Text widget
+        self.last_char = "\n"
+        # Whether a gray preview is currently shown, so it can be replaced
+        # without probing the widget for the "pending" tag
+        self.has_pending = False
+        # Tags of previews whose utterances are being refined, oldest first;
+        # each one is replaced by the next final text
+        self.refining = collections.deque()
+        self.refining_ids = itertools.count()
 
         # UI Components
         config_btn = tk.Button(self.root, text="⚙️", font=("Arial", 14), bg="black", fg="white", bd=0, command=self.open_settings)
@@ -76,6 +106,10 @@ class CaptionWindow:
 
         self.text_area = tk.Text(self.root, font=("Helvetica", 20), fg="white", bg="black", wrap="word", height=5, bd=0, highlightthickness=0, cursor="arrow")
         self.text_area.pack(fill="both", expand=True, padx=15, pady=15)
+        # Static tag styles are configured once; Tk keeps them for the widget's lifetime
+        self.text_area.tag_config("pending", foreground="gray")
+        self.text_area.tag_config("refining", foreground="gray")
+        self.text_area.tag_config("system_msg", foreground="#666666", font=("Helvetica", 12))
         self.text_area.insert("1.0", "⏳ Loading Model... Please wait.\n")
         self.text_area.config(state="disabled")
         
@@ -88,6 +122,8 @@ class CaptionWindow:
         
         # Start translation model loader in background
         threading.Thread(target=self.preload_translation_model, daemon=True).start()
+        self.translation_thread = threading.Thread(target=self.translation_loop, daemon=True)
+        self.translation_thread.start()
         
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
@@ -117,6 +153,7 @@ class CaptionWindow:
 
         # Horizontal position → monitor with mouse
         mouse_x, mouse_y = self.root.winfo_pointerxy()
+        from screeninfo import get_monitors
         monitors = get_monitors()
         target_monitor = None
 
@@ -143,8 +180,7 @@ class CaptionWindow:
         """Preload the lightweight LLM for translation to avoid lag on first click."""
         try:
             print(f"🧠 Pre-loading Translation Model ({self.translation_model_name})...")
-            from mlx_lm import load
-            self.translation_model, self.translation_tokenizer = load(self.translation_model_name)
+            self.translator.load(warm_up_lang=self.translation_lang)
             print("🧠 Translation Model Ready!")
         except Exception as e:
             print(f"⚠️ Failed to load translation model: {e}")
@@ -238,62 +274,87 @@ class CaptionWindow:
 
             self.insert_placeholder(target_seg_id) # Immediate visual feedback
 
-            # --- Start Background Task ---
-            print(f"🚀 Starting translation for: {segment_text[:30]}...")
-            threading.Thread(
-                target=self.perform_translation, 
-                args=(target_seg_id, segment_text), 
-                daemon=True
-            ).start()
+            # Repeated phrases are answered from the cache without pausing
+            # transcription
+            cached = self.translator.cached(segment_text, self.translation_lang)
+            if cached is not None:
+                self.insert_translation(target_seg_id, cached)
+                self.cleanup_lock(target_seg_id)
+                return
+
+            # --- Hand off to the translation worker ---
+            print(f"🚀 Queueing translation for: {segment_text[:30]}...")
+            self.translation_queue.put((target_seg_id, segment_text))
             
         except Exception as e:
             print(f"Click Error: {e}")
             if target_seg_id and target_seg_id in self.active_translations:
                  self.active_translations.remove(target_seg_id)
 
+    def translation_loop(self):
+        """Translates clicked segments one burst at a time.
+
+        Clicks arriving within translation_batch_window of the first one are
+        collected into a batch that shares a single transcription pause and
+        is decoded in one batched generate call. A lone click is streamed
+        into its caption line instead.
+        """
+        while True:
+            item = self.translation_queue.get()
+            if item is None:  # Window closing
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.translation_batch_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.translation_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Finish this batch, then stop on the next get
+                    self.translation_queue.put(None)
+                    break
+                batch.append(item)
+
+            # PAUSE TRANSCRIPTION
+            transcriber = self.transcriber
+            transcriber.pause()
+            if not transcriber.wait_paused(timeout=3.0):
+                # Still refining queued utterances: the GPU lock makes the
+                # LLM wait for the current Whisper call instead of overlapping it
+                print("⏳ Transcriber still busy, translating as soon as the GPU is free")
+            try:
+                if len(batch) == 1:
+                    self.perform_translation(*batch[0])
+                else:
+                    self.perform_batch_translation(batch)
+            finally:
+                transcriber.resume()
+
     def perform_translation(self, seg_id, text):
-        # PAUSE TRANSCRIPTION
-        self.transcriber.pause()
-        
-        start_wait = time.time()
-        while not self.transcriber.is_paused() and (time.time() - start_wait < 3.0):
-            time.sleep(0.1)
-            
         try:
             print(f"🔄 Translating '{text[:20]}...' to {self.translation_lang}...")
             
-            if not self.translation_model:
+            if self.translator.model is None:
                 self.schedule_set_status("⏳ Loading Translation Model...")
                 self.preload_translation_model()
 
-            from mlx_lm import generate
-            from mlx_lm.sample_utils import make_sampler
-            
-            lang_map = {
-                "en": "English", "es": "Spanish", "fr": "French", 
-                "de": "German", "it": "Italian", "pt": "Portuguese"
-            }
-            target_lang_name = lang_map.get(self.translation_lang, self.translation_lang)
+            # Show the translation as it is generated, redrawn at a bounded
+            # rate rather than once per token
+            last_redraw = 0.0
+            def on_partial(partial):
+                nonlocal last_redraw
+                now = time.monotonic()
+                if now - last_redraw >= self.translation_redraw_interval:
+                    last_redraw = now
+                    self.schedule_insert_translation(seg_id, partial.strip())
+
+            translation = self.translator.translate(text, self.translation_lang, on_partial)
             
-            messages = [
-                {"role": "system", "content": f"You are a professional interpreter. Translate the exact text provided below into {target_lang_name}. Translate every single sentence found in the input. Do not summarize, do not omit any details. Do not add explanations, just output the translation."},
-                {"role": "user", "content": f"'''{text}'''"}
-            ]
-            
-            prompt = self.translation_tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
-            
-            sampler = make_sampler(temp=0.1)
-
-            translation = generate(
-                self.translation_model, 
-                self.translation_tokenizer, 
-                prompt=prompt, 
-                max_tokens=500, 
-                verbose=False,
-                sampler=sampler
-            )
-            
-            self.schedule_insert_translation(seg_id, translation.strip())
+            self.schedule_insert_translation(seg_id, translation)
             
         except Exception as e:
             print(f"Translation Error: {e}")
@@ -301,7 +362,25 @@ class CaptionWindow:
             # Optionally remove placeholder or show error in text?
         finally:
             self.schedule_cleanup_lock(seg_id)
-            self.transcriber.resume()
+
+    def perform_batch_translation(self, batch):
+        try:
+            print(f"🔄 Translating {len(batch)} segments to {self.translation_lang}...")
+            
+            if self.translator.model is None:
+                self.schedule_set_status("⏳ Loading Translation Model...")
+                self.preload_translation_model()
+
+            translations = self.translator.translate_batch([text for _, text in batch], self.translation_lang)
+            for (seg_id, _), translation in zip(batch, translations):
+                self.schedule_insert_translation(seg_id, translation)
+            
+        except Exception as e:
+            print(f"Translation Error: {e}")
+            self.schedule_set_status(f"❌ Translation Error: {e}")
+        finally:
+            for seg_id, _ in batch:
+                self.schedule_cleanup_lock(seg_id)
 
     def schedule_cleanup_lock(self, seg_id):
         self.root.after(0, self.cleanup_lock, seg_id)
@@ -337,9 +416,8 @@ class CaptionWindow:
             trans_id = f"trans_{seg_id}"
             ranges = self.text_area.tag_ranges(trans_id)
             if ranges:
-                self.text_area.delete(ranges[0], ranges[1])
                 final_text = f"\n   ↳ {text}" 
-                self.text_area.insert(ranges[0], final_text, trans_id)
+                self.text_area.replace(ranges[0], ranges[1], final_text, trans_id)
                 self.text_area.tag_config(trans_id, font=("Helvetica", 17, "italic"), foreground="#90EE90", background="#0a0a0a")
             self.text_area.config(state="disabled")
         except: pass
@@ -351,7 +429,8 @@ class CaptionWindow:
             return
             
         self.transcriber.stop()
-        self.audio_recorder.stop()
+        # Keep the stream open: reopening Core Audio is what makes settings slow
+        self.audio_recorder.pause()
         
         self.config_window = ConfigWindow(parent=self.root, restart_callback=self.restart_processing, on_close_callback=self.on_config_close)
         
@@ -359,16 +438,18 @@ class CaptionWindow:
         self.config_window = None
         # Resume processing
         self.transcriber.start()
-        self.audio_recorder.start()
+        self.audio_recorder.resume()
 
     def restart_processing(self, model_size, device_index, device_name, language, translation_lang, translation_model):
         print(f"🔄 Restarting with Translation Lang: {translation_lang}, Model: {translation_model}")
         
         self.config_window = None
         
-        # Stop existing
+        # Stop existing (the stream is only reopened for a different device)
         self.transcriber.stop()
-        self.audio_recorder.stop()
+        same_device = device_index == self.device_index
+        if not same_device:
+            self.audio_recorder.stop()
         
         # Update State
         self.model_size = model_size
@@ -376,44 +457,80 @@ class CaptionWindow:
         self.device_name = device_name
         self.language = language if language != "auto" else None
         self.translation_lang = translation_lang
-        self.translation_model_name = translation_model
         
         # Reload translation model if it changed
-        self.translation_model = None
-        threading.Thread(target=self.preload_translation_model, daemon=True).start()
+        if translation_model != self.translation_model_name:
+            self.translation_model_name = translation_model
+            self.translator = get_translator(translation_model)
+            threading.Thread(target=self.preload_translation_model, daemon=True).start()
         
         # Update Window Title
         self.root.title(f"Live Captions - {device_name} ({model_size}) [{language} -> {translation_lang}]")
         
         # Re-initialize Core
-        # Reuse queue? Yes.
-        self.audio_recorder = AudioRecorder(device_index, 16000, self.audio_queue)
+        # Reuse ring? Yes.
+        if not same_device:
+            self.audio_recorder = AudioRecorder(device_index, 16000, self.audio_ring)
         
+        from .transcriber import Transcriber
         self.transcriber = Transcriber(
             model_size=self.model_size,
             language=self.language,
-            audio_queue=self.audio_queue,
+            audio_ring=self.audio_ring,
             update_callback=self.schedule_update_text,
             status_callback=self.schedule_set_status
         )
         
         self.transcriber.start()
-        self.audio_recorder.start()
+        self.audio_recorder.resume()
         
         self.set_status(f"🔄 Restarted with {model_size}...")
 
     def on_close(self):
-        self.transcriber.stop()
+        # Stop capture first so no new audio is produced, then the workers.
+        # Committed utterances still queued for refinement get a bounded
+        # chance to reach the transcript log.
         self.audio_recorder.stop()
+        self.transcriber.stop()
+        self.translation_queue.put(None)
+        stopped = self.transcriber.wait_stopped(timeout=5.0)
+        self.translation_thread.join(timeout=1.0)
+        self.translator.flush_cache()
+        flush_log()
         try:
             self.root.destroy()
         except:
             pass
-        import os
-        os._exit(0)
+        if not stopped or self.translation_thread.is_alive():
+            # A worker is stuck inside a model call; Metal teardown under a
+            # live evaluation can hang or crash the interpreter's shutdown
+            print("⚠️ Workers still busy, exiting without waiting for them")
+            os._exit(0)
 
     def schedule_update_text(self, text, is_final=True):
-        self.root.after(0, self.update_text, text, is_final)
+        with self.text_updates_lock:
+            last = self.text_updates[-1] if self.text_updates else None
+            if text is not None and not is_final and last and last[0] is not None and not last[1]:
+                # A newer preview supersedes one that was never drawn
+                self.text_updates[-1] = (text, is_final)
+            else:
+                self.text_updates.append((text, is_final))
+            if self.text_flush_scheduled:
+                return
+            self.text_flush_scheduled = True
+        self.root.after_idle(self.flush_text_updates)
+
+    def flush_text_updates(self):
+        """Draws all pending text updates in one idle callback."""
+        with self.text_updates_lock:
+            updates = self.text_updates
+            self.text_updates = []
+            self.text_flush_scheduled = False
+        for text, is_final in updates:
+            if text is None:  # transcriber.REFINING
+                self.mark_refining()
+            else:
+                self.update_text(text, is_final)
 
     def schedule_set_status(self, text):
         self.root.after(0, self.set_status, text)
@@ -421,20 +538,41 @@ class CaptionWindow:
     def update_text(self, text, is_final=True): 
         try:
             if not self.text_area.winfo_exists(): return
+            # Previews are superseded by the next commit anyway; don't lay
+            # out text nobody can see while the window is minimized. Clears
+            # ("" previews) still go through so no stale preview lingers
+            if not is_final and text and self.root.state() == "iconic": return
             
             self.text_area.config(state="normal")
             was_at_bottom = self.text_area.yview()[1] > 0.99
 
-            try:
+            # A final for an utterance that went to refinement replaces its
+            # preview in place; newer previews after it stay on screen
+            refining = self.refining.popleft() if is_final and self.refining else None
+            ranges = self.text_area.tag_ranges(refining) if refining else ()
+            if self.has_pending and not ranges:
                 self.text_area.delete("pending.first", "pending.last")
-            except tk.TclError:
-                pass 
+                self.has_pending = False
+
+            if ranges:
+                start, end = ranges[0], ranges[-1]
+                prev_char = self.text_area.get(f"{start}-1c", start)
+                at_tail = self.text_area.compare(end, "==", "pending.first" if self.has_pending else "end-1c")
+                self.text_area.delete(start, end)
+                self.text_area.tag_delete(refining)
+                if at_tail and not text:
+                    self.last_char = prev_char or "\n"
+            else:
+                start = tk.END
+                prev_char = self.last_char
+                at_tail = True
+                if refining:
+                    self.text_area.tag_delete(refining)
             
             if text:
                 prefix = ""
-                prev_char = self.text_area.get("end-2c", "end-1c")
-                current_time = datetime.datetime.now()
-                time_diff = (current_time - self.last_text_time).total_seconds()
+                current_time = time.monotonic()
+                time_diff = current_time - self.last_text_time
                 
                 if time_diff > self.paragraph_threshold:
                     prefix = "\n\n"
@@ -448,16 +586,20 @@ class CaptionWindow:
                 full_text = prefix + text
                 
                 if is_final:
-                    seg_id = f"seg_{int(current_time.timestamp() * 1000)}"
-                    self.text_area.insert(tk.END, full_text, seg_id)
+                    seg_id = f"seg_{next(self.segment_ids)}"
+                    self.text_area.insert(start, full_text, seg_id)
                     # Configure segment appearance
                     self.text_area.tag_config(seg_id, foreground="white", background="black")
                     self.text_area.tag_bind(seg_id, "<Enter>", lambda e, sid=seg_id: self.text_area.tag_config(sid, background="#1a1a1a"))
                     self.text_area.tag_bind(seg_id, "<Leave>", lambda e, sid=seg_id: self.text_area.tag_config(sid, background="black") if sid not in self.active_translations else None)
                     self.last_text_time = current_time
+                    if at_tail:
+                        self.last_char = full_text[-1]
+                    self.segments.append(seg_id)
+                    self._trim_history()
                 else:
                     self.text_area.insert(tk.END, full_text, "pending")
-                    self.text_area.tag_config("pending", foreground="gray")
+                    self.has_pending = True
                 
             if was_at_bottom:
                 self.text_area.see(tk.END)
@@ -466,16 +608,54 @@ class CaptionWindow:
         except Exception as e:
             print(f"Error updating text: {e}")
 
+    def mark_refining(self):
+        """Keeps the shown preview under its own tag while its utterance is
+        refined, so newer previews go after it instead of replacing it."""
+        try:
+            if not self.text_area.winfo_exists(): return
+            self.text_area.config(state="normal")
+            if self.has_pending:
+                start = self.text_area.index("pending.first")
+                end = self.text_area.index("pending.last")
+                self.text_area.tag_remove("pending", start, end)
+                self.has_pending = False
+            else:
+                # No preview shown for it: hold its place until the final lands
+                prefix = " " if self.last_char not in ("", " ", "\n") else ""
+                start = self.text_area.index("end-1c")
+                self.text_area.insert(tk.END, prefix + "…")
+                end = self.text_area.index("end-1c")
+            tag = f"refining_{next(self.refining_ids)}"
+            self.text_area.tag_add("refining", start, end)
+            self.text_area.tag_add(tag, start, end)
+            self.refining.append(tag)
+            self.last_char = self.text_area.get(f"{end}-1c", end)
+            self.text_area.config(state="disabled")
+        except Exception as e:
+            print(f"Error updating text: {e}")
+
+    def _trim_history(self):
+        """Deletes the oldest segments (and their translations) beyond max_segments."""
+        while len(self.segments) > self.max_segments:
+            seg_id = self.segments.popleft()
+            trans_id = f"trans_{seg_id}"
+            ranges = self.text_area.tag_ranges(trans_id) or self.text_area.tag_ranges(seg_id)
+            if ranges:
+                self.text_area.delete("1.0", ranges[-1])
+            self.text_area.tag_delete(seg_id, trans_id)
+            if self.hovered_segment == seg_id:
+                self.hovered_segment = None
+
     def set_status(self, text):
         try:
             if not self.text_area.winfo_exists(): return
             self.text_area.config(state="normal")
             
-            timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+            timestamp = time.strftime("%H:%M:%S")
             msg = f"\n\n[System {timestamp}: {text}]\n\n"
             
             self.text_area.insert(tk.END, msg, "system_msg")
-            self.text_area.tag_config("system_msg", foreground="#666666", font=("Helvetica", 12))
+            self.last_char = msg[-1]
             
             self.text_area.see(tk.END)
             self.text_area.config(state="disabled")
@@ -519,19 +699,14 @@ class ConfigWindow:
         self.device_combo = ttk.Combobox(self.root, width=40)
         self.device_combo.pack(pady=5)
         
-        self.devices = AudioRecorder.get_audio_devices()
-        device_names = [d['name'] for d in self.devices]
-        self.device_combo['values'] = device_names
-        
-        saved_device = self.config.get("device_name")
-        if saved_device and saved_device in device_names:
-             self.device_combo.set(saved_device)
-        else:
-             blackhole_idx = next((i for i, name in enumerate(device_names) if "BlackHole" in name), 0)
-             if blackhole_idx < len(device_names):
-                self.device_combo.current(blackhole_idx)
-             elif device_names:
-                self.device_combo.current(0)
+        # Enumerating devices initializes PortAudio, which can take a while
+        # with many virtual devices; do it off the UI thread
+        self.devices = None
+        self.device_indices = {}
+        self.device_combo['values'] = ["Loading..."]
+        self.device_combo.set("Loading...")
+        self.device_combo.config(state="disabled")
+        threading.Thread(target=self.load_devices, daemon=True).start()
 
         # Model Selection
         ttk.Label(self.root, text="Select Whisper Model Size:").pack(pady=10)
@@ -572,7 +747,7 @@ class ConfigWindow:
             "mlx-community/Mistral-Nemo-Instruct-2407-4bit"
         ]
         self.trans_model_combo.pack(pady=5)
-        self.trans_model_combo.set(self.config.get("translation_model", "mlx-community/gemma-2-2b-it-4bit"))
+        self.trans_model_combo.set(self.config.get("translation_model", DEFAULT_TRANSLATION_MODEL))
         
         ttk.Label(self.root, text="(Larger models = Better translation but slower)", font=("Arial", 10), foreground="gray").pack()
 
@@ -585,6 +760,30 @@ class ConfigWindow:
         if not parent:
             self.root.mainloop()
 
+    def load_devices(self):
+        devices = AudioRecorder.get_audio_devices()
+        try:
+            self.root.after(0, self.apply_devices, devices)
+        except: pass  # Window closed while enumerating
+
+    def apply_devices(self, devices):
+        self.devices = devices
+        self.device_indices = AudioRecorder.get_device_indices(devices)
+        device_names = [d['name'] for d in devices]
+        self.device_combo.config(state="normal")
+        self.device_combo['values'] = device_names
+        self.device_combo.set("")
+        
+        saved_device = self.config.get("device_name")
+        if saved_device and saved_device in device_names:
+             self.device_combo.set(saved_device)
+        else:
+             blackhole_idx = next((i for i, name in enumerate(device_names) if "BlackHole" in name), 0)
+             if blackhole_idx < len(device_names):
+                self.device_combo.current(blackhole_idx)
+             elif device_names:
+                self.device_combo.current(0)
+
     def on_close(self):
         if self.on_close_callback:
             self.on_close_callback()
@@ -593,6 +792,10 @@ class ConfigWindow:
         except: pass
 
     def start_app(self):
+        if self.devices is None:
+            messagebox.showwarning("Warning", "Audio devices are still loading.")
+            return
+
         selected_device_name = self.device_combo.get()
         selected_model = self.model_combo.get()
         selected_lang = self.lang_combo.get()
@@ -603,12 +806,7 @@ class ConfigWindow:
             messagebox.showwarning("Warning", "Please select an audio device.")
             return
 
-        device_index = None
-        for i, device in enumerate(self.devices):
-            if device['name'] == selected_device_name:
-                device_index = i
-                break
-        
+        device_index = self.device_indices.get(selected_device_name)
         if device_index is None:
             messagebox.showerror("Error", "Selected device not found.")
             return
@@ -621,6 +819,10 @@ class ConfigWindow:
             selected_trans_model
         )
         
+        # Start loading the translation LLM now so it overlaps with building
+        # the caption window rather than starting after it
+        preload_translator(selected_trans_model, selected_trans_lang)
+
         try:
              self.root.destroy()
         except:
@@ -1,7 +1,51 @@
+import atexit
 import datetime
+import threading
+import time
 from .config import LOG_FILE
 
+LOG_FLUSH_INTERVAL = 5.0  # Longest time a logged line waits in the buffer
+
+# Evaluating MLX on the GPU from two threads at once can crash Metal. Every
+# model call (Whisper previews and refinement, the translation LLM) holds this.
+gpu_lock = threading.RLock()
+
+_log_file = None
+_log_lock = threading.Lock()
+_flush_timer = None
+_timestamp_second = None
+_timestamp = ""
+
 def log_to_file(text):
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(f"[{timestamp}] {text}\n")
+    """Appends a line to the transcript log through a long-lived buffered handle."""
+    global _log_file, _flush_timer, _timestamp_second, _timestamp
+    now = time.time()
+
+    with _log_lock:
+        # Lines logged within the same second share the formatted timestamp
+        second = int(now)
+        if second != _timestamp_second:
+            _timestamp_second = second
+            _timestamp = datetime.datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+
+        if _log_file is None:
+            _log_file = open(LOG_FILE, "a", encoding="utf-8", buffering=1 << 16)
+        _log_file.write(f"[{_timestamp}] {text}\n")
+        # Flush from a timer, so the last lines before a pause in speech
+        # reach the file without waiting for the next one
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(LOG_FLUSH_INTERVAL, flush_log)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+def flush_log():
+    """Writes any buffered transcript lines to disk."""
+    global _flush_timer
+    with _log_lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        if _log_file is not None:
+            _log_file.flush()
+
+atexit.register(flush_log)
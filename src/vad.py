@@ -0,0 +1,194 @@
+import math
+import queue
+import threading
+from typing import Optional
+import numpy as np
+from .config import SAMPLE_RATE, AUDIO_BLOCK_SIZE
+from .audio_handler import AudioRingBuffer
+
+# Marker put on the speech queue when an utterance ends
+END_OF_SPEECH = None
+
+# Silero-VAD expects 512-sample (32 ms) frames at 16 kHz
+SILERO_FRAME_SIZE = 512
+
+# WebRTC VAD accepts 10, 20 or 30 ms frames; 10 ms tiles a block most closely
+WEBRTC_FRAME_SIZE = SAMPLE_RATE // 100
+WEBRTC_AGGRESSIVENESS = 2  # 0 (least) to 3 (most aggressive at filtering non-speech)
+
+# Bounds for the adaptive peak gate in front of Silero-VAD
+MIN_PEAK_GATE = 0.005
+MAX_PEAK_GATE = 0.02
+
+_silero_model = None
+_webrtc_vad = None
+
+def load_silero_model():
+    """Loads Silero-VAD once per process. Returns None if it is not installed."""
+    global _silero_model
+    if _silero_model is None:
+        try:
+            import torch
+            from silero_vad import load_silero_vad
+            torch.set_num_threads(1)
+            _silero_model = load_silero_vad()
+            print("🗣️ Silero-VAD loaded")
+        except Exception as e:
+            print(f"⚠️ Silero-VAD unavailable: {e}")
+            _silero_model = False
+    return _silero_model or None
+
+def load_webrtc_vad():
+    """Creates a WebRTC VAD once per process. Returns None if it is not installed."""
+    global _webrtc_vad
+    if _webrtc_vad is None:
+        try:
+            import webrtcvad
+            _webrtc_vad = webrtcvad.Vad(WEBRTC_AGGRESSIVENESS)
+            print("🗣️ WebRTC VAD loaded")
+        except Exception as e:
+            print(f"⚠️ WebRTC VAD unavailable, using energy threshold: {e}")
+            _webrtc_vad = False
+    return _webrtc_vad or None
+
+class VoiceActivityDetector:
+    """Pipeline stage between audio capture and ASR.
+
+    Runs on its own thread, reading captured blocks from `audio_ring` and
+    forwarding only those that contain speech to `out_queue`, so Whisper never
+    sees long stretches of silence. Speech is scored with Silero-VAD when it is
+    installed, else with the WebRTC VAD, else with an energy threshold. A short
+    hangover of trailing silence is kept after speech so the transcriber can
+    still detect sentence ends, then END_OF_SPEECH is emitted once.
+    """
+
+    def __init__(
+        self,
+        audio_ring: AudioRingBuffer,
+        out_queue: queue.Queue,
+        threshold: float = 0.01,
+        hangover_seconds: float = 0.6,
+        speech_probability: float = 0.5,
+        idle_wait: float = 0.25
+    ):
+        self.audio_ring = audio_ring
+        self.out_queue = out_queue
+        self.threshold = threshold
+        self.hangover_frames = int(hangover_seconds * SAMPLE_RATE)
+        self.speech_probability = speech_probability
+        self.idle_wait = idle_wait
+        self.model = None
+        self.torch = None  # Imported alongside Silero-VAD
+        self.webrtc_vad = None
+
+        # Rolling estimate of the background peak level, used to skip the
+        # neural VAD on obvious silence
+        self.noise_floor = MIN_PEAK_GATE / 3
+        self._scratch = np.empty(AUDIO_BLOCK_SIZE, dtype=np.float32)
+        # Raw int16 copy of each block for the WebRTC VAD, filled by the ring
+        self._pcm = np.empty(AUDIO_BLOCK_SIZE, dtype=np.int16)
+
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Starts the VAD loop in a separate thread."""
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops the VAD loop."""
+        self.stop_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+
+    @property
+    def is_neural(self) -> bool:
+        """True once Silero or the WebRTC VAD gates speech, rather than energy alone."""
+        return self.model is not None or bool(self.webrtc_vad)
+
+    def is_speech(self, block: np.ndarray, pcm: Optional[np.ndarray] = None) -> bool:
+        """Returns True if the block contains speech.
+
+        `pcm` is the block's original int16 samples, used by the WebRTC VAD.
+        """
+        if self.model is None and self.webrtc_vad is not None and pcm is not None:
+            pcm = pcm[:len(block)].tobytes()
+            frame_bytes = 2 * WEBRTC_FRAME_SIZE
+            # Score every frame: the VAD adapts its noise estimate as it goes
+            votes = [
+                self.webrtc_vad.is_speech(pcm[i:i + frame_bytes], SAMPLE_RATE)
+                for i in range(0, len(pcm) - frame_bytes + 1, frame_bytes)
+            ]
+            if votes:
+                return any(votes)
+
+        n_frames = len(block) // SILERO_FRAME_SIZE
+        if self.model is None or n_frames == 0:
+            # Energy fallback: one dot product, no squared temporary
+            return math.sqrt(float(np.dot(block, block)) / len(block)) >= self.threshold
+
+        # Cheap peak gate: a single pass over the block, no allocation
+        peak = float(np.abs(block, out=self._scratch[:len(block)]).max())
+        gate = min(max(3 * self.noise_floor, MIN_PEAK_GATE), MAX_PEAK_GATE)
+        if peak < gate:
+            self.noise_floor = 0.99 * self.noise_floor + 0.01 * peak
+            return False
+
+        frames = self.torch.from_numpy(block[:n_frames * SILERO_FRAME_SIZE]).reshape(n_frames, SILERO_FRAME_SIZE)
+        # Score every frame: the model is stateful across consecutive frames
+        probabilities = [self.model(frame, SAMPLE_RATE).item() for frame in frames]
+        if max(probabilities) >= self.speech_probability:
+            return True
+        self.noise_floor = 0.99 * self.noise_floor + 0.01 * peak
+        return False
+
+    def _run_loop(self):
+        self.model = load_silero_model()
+        if self.model is not None:
+            import torch
+            self.torch = torch
+            self.model.reset_states()
+        else:
+            self.webrtc_vad = load_webrtc_vad()
+
+        silence_left = 0
+        in_speech = False
+
+        # Hoisted lookups for the per-block loop
+        stopped = self.stop_event.is_set
+        read = self.audio_ring.read
+        is_speech = self.is_speech
+        put = self._put
+        hangover_frames = self.hangover_frames
+        idle_wait = self.idle_wait
+        # Only the WebRTC VAD needs the raw samples
+        pcm = self._pcm if self.model is None and self.webrtc_vad is not None else None
+
+        while not stopped():
+            block = read(AUDIO_BLOCK_SIZE, idle_wait, pcm)
+            if block is None:
+                continue
+
+            if is_speech(block, pcm):
+                in_speech = True
+                silence_left = hangover_frames
+            elif silence_left > 0:
+                silence_left -= len(block)
+            else:
+                if in_speech:
+                    in_speech = False
+                    put(END_OF_SPEECH)
+                continue
+
+            put(block)
+
+    def _put(self, item: Optional[np.ndarray]):
+        # Blocking put: a busy ASR stage backs up into the capture ring
+        while not self.stop_event.is_set():
+            try:
+                self.out_queue.put(item, timeout=0.05)
+                return
+            except queue.Full:
+                continue